@@ -1,14 +1,21 @@
+import contextlib
 import csv
+import gc
 import itertools
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 from AssociationRule import AssociationRule
+from SupportCounting import BLOCK_BYTES, LEVEL_ROWS_BYTES, PARALLEL_MIN_CANDIDATES, columnCounts, compactBits, loadBatchSupport, popcount64, trieSupportCounts
+
 class Apriori():
     """
     An implementation of the Apriori unsupervised machine learning algorithm for frequent item set mining and association rule learning
     
     """
-    def __init__(self, minsup:float, minconf:float, minlift:float, path:str):
+    def __init__(self, minsup:float, minconf:float, minlift:float, path:str, verbose:bool=False, maxLength:int=None):
         """Initalise the Apiori class
 
         Parameters:
@@ -16,17 +23,45 @@ class Apriori():
         minconf (float): Minimum confidence
         minlift (float): Minimum lift
         path (str): Transaction CSV path - each line is transaction of items seperated by comma
+        verbose (bool): Print per-level progress while mining (default False)
+        maxLength (int): Longest itemset to mine - mining stops after this level (default None, no limit) - must be at least 1
         items (set): The set of unique items found across all transactions - initalised by generateUniqueItemSet()
-        transactions (list): A list of sets for each transaction - where each is a set of items
+        transactions (list): A list of frozensets for each transaction - where each is a set of items
+        itemIds (dict): Maps each item to its id - its row in the bitmap and its bit in an itemset mask
+        itemNames (list): The item of each id
+        transactionItems (np.ndarray): CSR item ids - the sorted ids of transaction t are transactionItems[transactionOffsets[t]:transactionOffsets[t+1]]
+        transactionOffsets (np.ndarray): CSR offsets of each transaction into transactionItems
+        bitmap (np.ndarray): Vertical uint64 bitmap of shape (items, ceil(transactions/64)) - bit t of row i is set iff transaction t contains item i
+        numTransactions (int): The number of transactions read from the CSV
+        invNumTransactions (float): 1 / numTransactions - support is a multiply rather than a divide on the hot path
+        countCache (dict): Memoised frequency counts keyed by itemset mask
+        levelRows (np.ndarray): Bitmaps of the frequent itemsets of the last level counted - the dense form of their tid-lists
+        levelIndex (dict): Maps each of those itemset masks to its row in levelRows
+        levelTids (np.ndarray): The transaction of each bit column of levelRows - transactions that cannot contain a longer itemset are dropped
 
         Returns:
         None:Returning value
         """
+        if maxLength is not None and maxLength < 1:
+            raise ValueError("maxLength must be at least 1, got {}".format(maxLength))
         self.minsup = minsup
         self.minconf = minconf
         self.minlift = minlift
         self.path = path
+        self.verbose = verbose
+        self.maxLength = maxLength
         self.transactions = []
+        self.itemIds = {}
+        self.itemNames = []
+        self.transactionItems = None
+        self.transactionOffsets = None
+        self.bitmap = None
+        self.numTransactions = 0
+        self.invNumTransactions = 0.0
+        self.countCache = {}
+        self.levelRows = None
+        self.levelIndex = {}
+        self.levelTids = None
         self.items = []
         self.importTransactions()
         self.generateUniqueItemSet()
@@ -45,69 +80,77 @@ class Apriori():
         print("Complete.")
         return frequentSets, associationRules
 
-    def generateAssociationRules(self, frequentSets:list)->list:
+    def generateAssociationRules(self, frequentSets:dict)->list:
         """
-        Generates a list of association rules that meet the confidence and lift thresholds
+        Generates a list of association rules that meet the confidence and lift thresholds.
+        Heads are grown level by level from single items, and a head is only extended while its rule passes minconf -
+        moving items from the body to the head can only lower the confidence, so no larger head can pass once one fails
 
         Parameters:
-        frequentSets (list): A list of frequent itemsets
+        frequentSets (dict): Frequent itemsets mapped to their support, as returned by generateFrequentSets()
 
         Returns:
         list: A list containing the association rules that pass the support, confidence and lift thresholds
         """
         associationRules = []
-        # partition the set  
-        for itemset in frequentSets:
-            for i in range(len(itemset)):
-                for c in [c for c in itertools.combinations(itemset, i+1)]:
-                    body = set(list(c))
-                    head = set([i for i in itemset if not i in c])
-                    if (len(head) > 0 and len(body) > 0):
-                        # from head/body partitions create association rules 
-                        associationRule = AssociationRule(body, head) # X -> Y
-                        associationRule.support = self.calculateSupport(associationRule.itemset)
-                        associationRule.confidence = self.calculateConfidence(associationRule.itemset, associationRule.body)
-                        associationRule.lift = self.calculateLift(associationRule.body, associationRule.head, associationRule.confidence)
-                        # test is rule passes minconf, minsup and minlift
-                        if (associationRule.confidence >= self.minconf) and (associationRule.support >= self.minsup) and (associationRule.lift >= self.minlift):
-                            associationRules.append(associationRule)
+        for itemset, support in frequentSets.items(): # support is the same for every body/head partition of the itemset
+            itemset = self.itemsetToMask(itemset)
+            heads = [1 << i for i in self.maskToIds(itemset)] # H_1
+            m = 1
+            while len(heads) > 0 and m < itemset.bit_count():
+                passingHeads = []
+                for head in heads:
+                    body = itemset ^ head
+                    confidence = support / self.calculateSupport(body)
+                    if confidence < self.minconf:
+                        continue
+                    passingHeads.append(head)
+                    lift = self.calculateLift(body, head, confidence)
+                    # test is rule passes minsup and minlift
+                    if (support >= self.minsup) and (lift >= self.minlift):
+                        # from head/body partitions create association rules - only for the rules that are kept
+                        associationRule = AssociationRule(set(self.maskToItemset(body)), set(self.maskToItemset(head)), support, confidence, lift) # X -> Y
+                        associationRules.append(associationRule)
+                # H_(m+1) - join the passing heads, keeping those whose every m-subset also passed
+                m += 1
+                heads = self.prune(self.generateItemSets(passingHeads, m), passingHeads)
         return associationRules
 
-    def generateFrequentSets(self)->list:
+    def generateFrequentSets(self)->dict:
         """
         Implements the Apriori frequent itemset generation algorithm.
-        Where itemsets is c_k and frequentSets = l_k 
+        Where itemsets is c_k and frequentSets = l_k. Itemsets are handled as bitmasks until they are returned
 
         Returns:
-        list: A list of frequent itemsets of size k-1
+        dict: The frequent itemsets of every size mapped to their support - each itemset appears once
         """
         allFrequentSets = []
 
         # Generate frequent itemsets of length k
-        frequentSets, infrequentSets = self.eliminateCandidates(self.items) # c_1
-        for fset in frequentSets:
-            allFrequentSets.append(fset)
+        frequentSets = self.eliminateCandidates([self.itemsetToMask(item) for item in self.items]) # c_1
+        allFrequentSets.extend(frequentSets)
         # Repeat until no new frequent itemsets are identified
         k = 1
         while True:  
             k += 1
-            print("     k = " + str(k) + "    " , end="\n")
+            if self.maxLength is not None and k > self.maxLength:
+                break
+            if self.verbose:
+                print("     k = " + str(k) + "    " , end="\n")
             # Generate length (k+1) candidate itemsets from length k frequent itemsets
             itemsets = self.generateItemSets(frequentSets, k)
-            # Prune candidate itemsets containing subsets of length k that are infrequent
-            itemsets = self.prune(itemsets, infrequentSets)
+            # Prune candidate itemsets containing subsets of length k-1 that are not frequent
+            itemsets = self.prune(itemsets, frequentSets)
             # Count the support of each candidate by scanning the DB
             # Eliminate candidates that are infrequent, leaving only those that are frequent
-            prevFrequentSets = frequentSets.copy() # holds a copy of frequent sets for k-1
-            frequentSets, infrequentSets = self.eliminateCandidates(itemsets)
-            # Runs until no frequent itemsets are identified
-            if len(frequentSets) == 0:
-                frequentSets = prevFrequentSets
+            nextFrequentSets = self.eliminateCandidates(itemsets)
+            # Runs until no frequent itemsets are identified - frequentSets is left holding those of size k-1
+            if len(nextFrequentSets) == 0:
                 break
+            frequentSets = nextFrequentSets
             # stores all the frequent itemsets of size k
-            for fset in frequentSets:
-                allFrequentSets.append(fset)
-        return allFrequentSets
+            allFrequentSets.extend(frequentSets)
+        return {self.maskToItemset(fset): self.countCache[fset] * self.invNumTransactions for fset in allFrequentSets}
 
     def sortAssociationRules(self, associationRules:list)->list: # TODO: sorted output list
         """
@@ -121,99 +164,223 @@ class Apriori():
         list: A sorted list of AssociationRule objects
 
         """
-        associationRules = sorted(associationRules, key=lambda x: x.support, reverse=True) # support (decreasing)
-        associationRules = sorted(associationRules, key=lambda x: x.confidence, reverse=False) # confidence
-        associationRules = sorted(associationRules, key=lambda x: x.lift, reverse=False) # lift value
-        associationRules = sorted(associationRules, key=lambda x: len(x.itemset), reverse=True) # number of items (decreasing)
-
-        return associationRules
+        # number of items (decreasing), lift value, confidence, then support (decreasing)
+        return sorted(associationRules, key=lambda x: (-len(x.itemset), x.lift, x.confidence, -x.support))
     
-    def eliminateCandidates(self, itemsets:list)->tuple:
+    def eliminateCandidates(self, itemsets:list)->list:
         """
         Sorts candiadate itemsets by calculating the support value and comparing to the mininimum support value
 
         Parameters:
-        itemsets (list): A list of sets to sort
+        itemsets (list): A list of itemset masks to sort
 
         Returns:
-        tuple: Returns a tuple of two sets. Containing the eliminated rules and one containing rules that pass
+        list: The itemsets that pass
         """
         frequentSets = []
-        infrequentSets = []
+        supports = self.calculateSupportValues(itemsets) # count every candidate in one pass
         for i in range(len(itemsets)):
-            if not self.calculateSupport(itemsets[i]) < self.minsup:
+            if not supports[i] < self.minsup:
                 frequentSets.append(itemsets[i])
-            else:
-                infrequentSets.append(itemsets[i])
-        return frequentSets, infrequentSets
+        return frequentSets
 
-    def generateItemSets(self, items:set, k:int)->list:
+    def generateItemSets(self, items:list, k:int)->list:
         """
-        Generates combinations of itemsets and returns a list of sets
+        Generates candidate itemsets of length k by the F(k-1) x F(k-1) prefix join.
+        The last item of an itemset mask is its highest set bit and two itemsets are joined only if their first k-2 items are identical,
+        so every candidate is produced exactly once
 
         Parameters
-        items (set): The set of items to generate combinations from
+        items (list): The frequent itemset masks of length k-1 to join
         k (int): The length of the generated sets
 
         Returns:
-        list: List of the generated combinations of length k
+        list: List of the generated itemset masks of length k
         """
-        pairs = list(itertools.combinations(items, 2))
+        groups = {} # (k-2) prefix -> last items of the itemsets sharing it
+        for itemset in items:
+            last = 1 << (itemset.bit_length() - 1)
+            groups.setdefault(itemset ^ last, []).append(last)
 
         itemsets = []
-        for pair in pairs:
-            set1 = pair[0]
-            set2 = pair[1]
-            set3 = set1.union(set2)
-            if set3 not in itemsets and len(set3) == k:
-                itemsets.append(set3)
+        for prefix, lastItems in groups.items():
+            for a, b in itertools.combinations(lastItems, 2):
+                itemsets.append(prefix | a | b)
         return itemsets
 
     def generateUniqueItemSet(self):
         """
-        Generates a set of items that appear across all transactions. Updates the class attribute self.transactions
+        Generates a set of items that appear across all transactions. Updates the class attribute self.items
+        importTransactions() has already found the unique items, so this only wraps each one in order of item id
         """
-        items = set()
-        for transaction in self.transactions:
-            for item in transaction:
-                if item not in self.items:
-                    items.add(item)
-        for item in items:
-            s = set()
-            s.add(item)
-            self.items.append(s)
+        self.items = [frozenset((item,)) for item in self.itemNames]
 
     def importTransactions(self):
         """
-        Reads in the csv file of transactions. The file is assumed to have no header. Each row is a set of items contained within a transaction
+        Reads in the csv file of transactions. The file is assumed to have no header. Each row is a set of items contained within a transaction.
+        The file is parsed once by csv.reader, its fields factorized by pandas so each distinct token is cleaned only once, then laid out in
+        CSR (item ids, offsets) form and from it the vertical bitmap of each item, where bit t is set if transaction t contains that item.
+        Empty fields are not treated as items
         """
-        with open(self.path, 'r', newline='') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                cleanedRow = []
-                for item in row:
-                    cleanedRow.append(item.strip().upper())
-                self.transactions.append(set(cleanedRow))
-
-    def calculateSupport(self, itemset:set)->float:
+        with open(self.path, 'r', newline='') as f, gcPaused():
+            rows = list(csv.reader(f))
+        self.numTransactions = len(rows)
+        self.invNumTransactions = 1.0 / self.numTransactions if self.numTransactions > 0 else 0.0
+        lengths = np.fromiter(map(len, rows), dtype=np.intp, count=len(rows))
+        cells, tokens = pd.factorize(np.fromiter(itertools.chain.from_iterable(rows), dtype=object, count=int(lengths.sum())))
+
+        # clean each distinct token once rather than every cell, then merge tokens that clean to the same item -
+        # str.upper() rather than np.char, whose fixed width truncates items that grow when upper-cased ('ß' -> 'SS')
+        cleaned = [token.strip().upper() for token in tokens]
+        items = sorted(set(cleaned) - {''})
+        itemIndex = {item: i for i, item in enumerate(items)}
+        itemIndex[''] = -1
+        cells = np.array([itemIndex[item] for item in cleaned], dtype=np.int64)[cells]
+        # sort the cells by (transaction, item id), then drop empty fields and repeated items
+        keys = np.sort(np.repeat(np.arange(self.numTransactions, dtype=np.int64), lengths) * (len(items) + 1) + (cells + 1))
+        cells = keys % (len(items) + 1) - 1
+        keep = cells >= 0
+        keep[1:] &= keys[1:] != keys[:-1]
+        self.itemNames = items
+        self.itemIds = {item: i for i, item in enumerate(self.itemNames)}
+        self.transactionItems = cells[keep].astype(np.int32)
+        self.transactionOffsets = np.zeros(self.numTransactions + 1, dtype=np.int32)
+        np.cumsum(np.bincount(keys[keep] // (len(items) + 1), minlength=self.numTransactions), out=self.transactionOffsets[1:])
+
+        transactionItems = self.transactionItems.tolist()
+        offsets = self.transactionOffsets.tolist()
+        with gcPaused():
+            for start, end in zip(offsets, offsets[1:]):
+                self.transactions.append(frozenset(map(self.itemNames.__getitem__, transactionItems[start:end])))
+
+        # set bit t of an item's row for every transaction t containing it
+        rows = self.transactionItems.astype(np.intp)
+        tids = np.repeat(np.arange(self.numTransactions, dtype=np.uint64), np.diff(self.transactionOffsets))
+        self.bitmap = np.zeros((len(self.itemIds), (self.numTransactions + 63) // 64), dtype=np.uint64)
+        np.bitwise_or.at(self.bitmap, (rows, (tids >> np.uint64(6)).astype(np.intp)), np.uint64(1) << (tids & np.uint64(63)))
+
+    def calculateSupport(self, itemset)->float:
         """
         Calculates the support value of a set by dividing the number of transactions a set occurs in with the total number of transactions
 
         Parameters
-        itemset (set): A set of items
+        itemset (set|int): A set of items, or its bitmask
 
         Returns:
         float: The support value for that set (rule)
 
         """
-        return self.count(itemset) / len(self.transactions)
+        return self.count(itemset) * self.invNumTransactions
 
-    def calculateConfidence(self, itemset:set, body:set)->float:
+    def calculateSupportValues(self, itemsets:list)->list:
+        """
+        Calculates the support value of every itemset in a single pass over the bitmap.
+        When called level by level (as generateFrequentSets does), each candidate of length k is the join of two frequent
+        (k-1)-itemsets and its bitmap is the AND of their bitmaps, kept from the previous level as in Eclat - one AND per candidate
+        regardless of k. Candidates are ANDed in blocks of at most BLOCK_BYTES, and the bitmaps of the frequent candidates are kept
+        in turn for the next level unless they outgrow LEVEL_ROWS_BYTES.
+        Otherwise uses the parallel batchSupport kernel when Numba is installed, or trieSupportCounts -
+        split across threads for large levels, as NumPy releases the GIL inside its kernels and the bitmap need not be copied to worker processes
+
+        Parameters:
+        itemsets (list): A list of itemset masks of the same length
+
+        Returns:
+        list: The support value for each itemset
+        """
+        if len(itemsets) == 0:
+            return []
+        k = itemsets[0].bit_count()
+        left = right = None
+        if k == 1:
+            parentRows = self.bitmap
+            left = np.array([itemset.bit_length() - 1 for itemset in itemsets], dtype=np.intp)
+        elif self.levelRows is not None:
+            # the two joined (k-1)-itemsets - without the last item, and without the second last
+            parentRows = self.levelRows
+            left, right = [], []
+            for itemset in itemsets:
+                rest = itemset ^ (1 << (itemset.bit_length() - 1))
+                left.append(self.levelIndex.get(rest))
+                right.append(self.levelIndex.get(itemset ^ (1 << (rest.bit_length() - 1))))
+            if None in left or None in right:
+                left = right = None
+            else:
+                left, right = np.array(left, dtype=np.intp), np.array(right, dtype=np.intp)
+
+        if left is not None:
+            counts = np.empty(len(itemsets), dtype=np.int64)
+            rowBytes = 8 * max(parentRows.shape[1], 1)
+            blockSize = max(BLOCK_BYTES // rowBytes, 1)
+            keptRows, keptBytes = [], 0
+            for start in range(0, len(itemsets), blockSize):
+                rows = parentRows[left[start:start+blockSize]]
+                if right is not None:
+                    rows &= parentRows[right[start:start+blockSize]]
+                counts[start:start+blockSize] = popcount64(rows).sum(axis=1)
+                if keptRows is not None:
+                    rows = rows[~(counts[start:start+blockSize] * self.invNumTransactions < self.minsup)]
+                    keptBytes += rows.nbytes
+                    if keptBytes > LEVEL_ROWS_BYTES:
+                        keptRows = None # too many frequent bitmaps to keep - the next level is counted from the item bitmap instead
+                    else:
+                        keptRows.append(rows)
+            if keptRows is not None:
+                frequent = ~(counts * self.invNumTransactions < self.minsup)
+                self.levelRows = np.concatenate(keptRows)
+                frequentSets = list(itertools.compress(itemsets, frequent.tolist()))
+                self.levelIndex = {itemset: i for i, itemset in enumerate(frequentSets)}
+                if k == 1:
+                    self.levelTids = np.arange(self.numTransactions)
+                self.reduceTransactions(frequentSets, k)
+            else:
+                self.levelRows, self.levelIndex, self.levelTids = None, {}, None
+        else:
+            ids = np.array([self.maskToIds(itemset) for itemset in itemsets], dtype=np.intp)
+            batchSupport = loadBatchSupport()
+            if batchSupport is not None:
+                counts = np.empty(len(ids), dtype=np.int64)
+                batchSupport(self.bitmap, ids.astype(np.int32), counts)
+            elif len(ids) >= PARALLEL_MIN_CANDIDATES and (os.cpu_count() or 1) > 1:
+                order = np.lexsort(ids.T[::-1]) # sorted rows keep shared prefixes within one chunk
+                with ThreadPoolExecutor() as executor:
+                    chunks = np.array_split(ids[order], os.cpu_count())
+                    parts = list(executor.map(lambda chunk: trieSupportCounts(self.bitmap, chunk), chunks))
+                counts = np.empty(len(ids), dtype=np.int64)
+                counts[order] = np.concatenate(parts)
+            else:
+                counts = trieSupportCounts(self.bitmap, ids)
+        self.countCache.update(zip(itemsets, counts.tolist()))
+        return (counts * self.invNumTransactions).tolist()
+
+    def reduceTransactions(self, frequentSets:list, k:int):
+        """
+        Transaction reduction - a transaction containing k or fewer of the items in the frequent itemsets of length k
+        cannot contain any candidate of length k+1, so its bit is zero in every candidate's bitmap.
+        Once at least half of the transactions of levelRows are such, their bit columns are dropped so the next level ANDs narrower rows
+
+        Parameters:
+        frequentSets (list): The frequent itemset masks of length k, in the order of levelRows
+        k (int): The length of the itemsets
+        """
+        items = 0
+        for itemset in frequentSets:
+            items |= itemset
+        # number of those items in each transaction
+        sizes = columnCounts(self.bitmap[self.maskToIds(items)], self.numTransactions)
+        keep = sizes[self.levelTids] > k
+        if 2 * np.count_nonzero(keep) > len(keep):
+            return
+        self.levelRows = compactBits(self.levelRows, keep)
+        self.levelTids = self.levelTids[keep]
+
+    def calculateConfidence(self, itemset, body)->float:
         """
         Calculates how often items in Y appear in transactions containing X
 
         Parameters
-        set (set): A set of items
+        itemset (set|int): A set of items, or its bitmask
+        body (set|int): The body X of the rule, or its bitmask
 
         Returns
         float: The confidence value for that set (rule)
@@ -221,71 +388,141 @@ class Apriori():
         """
         return self.calculateSupport(itemset) / self.calculateSupport(body)
 
-    def calculateLift(self, body:list, head:list, confidence:float)->float:
+    def calculateLift(self, body, head, confidence:float)->float:
         """
         Calculates the importance of a rule
+
+        Parameters:
+        body (set|int): The set of items in the association rule body, or its bitmask
+        head (set|int): The set of items in the head of the association rule, or its bitmask
+        confidence (float): The confidence of the association rule
+
+        Returns:
+        float: The lift value of the association rule
+
         """
-        bodySupport = self.calculateSupport(body)
-        headSupport = self.calculateSupport(head)
-        return confidence / ((bodySupport * headSupport) / bodySupport)
+        return confidence / self.calculateSupport(head) # conf(X -> Y) / sup(Y) - the body support cancels out
 
-    def count(self, s:set)->int:
+    def count(self, s)->int:
         """
+        Counts are memoised in self.countCache so repeated lookups of the same itemset are O(1)
+
         Parameters
-        set (set): A set of items
+        s (set|int): A set of items, or its bitmask
 
         Returns:
         int: Frequency count for how many times s is a subset of a transaction t
         """
-        count = 0
-        for transaction in self.transactions:
-            if set(s).issubset(transaction):
-                count += 1
+        if not isinstance(s, int):
+            if any(i not in self.itemIds for i in s):
+                return 0
+            s = self.itemsetToMask(s)
+        if s in self.countCache:
+            return self.countCache[s]
+        if s == 0:
+            count = self.numTransactions
+        else:
+            # AND the item bitmaps together - the set bits are the transactions containing every item in s
+            row = np.bitwise_and.reduce(self.bitmap[self.maskToIds(s)], axis=0)
+            count = int(popcount64(row).sum())
+        self.countCache[s] = count
         return count
 
-    def prune(self, itemsets:list, infrequentSets:list)->list:
+    def itemsetToMask(self, itemset:set)->int:
+        """
+        Encodes a set of items as an int bitmask - bit i is set iff the itemset contains the item with id i
+
+        Parameters
+        itemset (set): A set of items
+
+        Returns:
+        int: The itemset bitmask
         """
-        Prunes itemsets from the list of itemsets if any of the sets in infrequentSets are subsets of the itemset
+        mask = 0
+        for item in itemset:
+            mask |= 1 << self.itemIds[item]
+        return mask
+
+    def maskToIds(self, mask:int)->list:
+        """
+        Decodes an itemset bitmask into the ids of its items
+
+        Parameters
+        mask (int): An itemset bitmask
+
+        Returns:
+        list: The item ids in increasing order
+        """
+        ids = []
+        while mask:
+            low = mask & -mask
+            ids.append(low.bit_length() - 1)
+            mask ^= low
+        return ids
+
+    def maskToItemset(self, mask:int)->frozenset:
+        """
+        Decodes an itemset bitmask into the set of its items
+
+        Parameters
+        mask (int): An itemset bitmask
+
+        Returns:
+        frozenset: The set of items
+        """
+        return frozenset(map(self.itemNames.__getitem__, self.maskToIds(mask)))
+
+    def prune(self, itemsets:list, frequentSets:list)->list:
+        """
+        Prunes itemsets from the list of itemsets unless every subset of length k-1 is in frequentSets (the Apriori property).
+        Each subset is the itemset mask with one bit cleared, so pruning is O(k) int hash lookups per itemset
 
         Parameter
-        itemsets (list): A list of itemsets to prune
-        infrequentSets (list): A list of subsets to check
+        itemsets (list): A list of itemset masks of length k to prune
+        frequentSets (list): The frequent itemset masks of length k-1
 
         Returns
         list: A pruned list of itemsets
         """
-        if len(infrequentSets) == 0:
-            return itemsets
-        else:
-            for i in range(len(itemsets)):
-                #print("     " +str(round(i / len(itemsets) * 100, 2)) + "%", end="")
-                #print("\r", end="")
-                for j in range(len(infrequentSets)):
-                    if itemsets[i] == None: 
-                        break # set has been pruned so all other comparisons can be skipped
-                    elif (infrequentSets[j].issubset(itemsets[i])):
-                        itemsets[i] = None
-            prunedSets = [itemset for itemset in itemsets if itemset is not None] # filter all nonpruned itemsets
-            return prunedSets
+        frequentSets = set(frequentSets)
+        prunedSets = []
+        for itemset in itemsets:
+            bits = itemset
+            while bits:
+                low = bits & -bits
+                if itemset ^ low not in frequentSets:
+                    break
+                bits ^= low
+            else:
+                prunedSets.append(itemset)
+        return prunedSets
+
+@contextlib.contextmanager
+def gcPaused():
+    """
+    Pauses the cyclic garbage collector for the duration of the block.
+    Importing allocates a list or set per transaction but no reference cycles, and with the collector running
+    each collection would rescan every transaction read so far
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
 
 def displayAssociationRules(associationRules:list):
     """
-    Displays each association rule in a df alongside itemset frequency, 
+    Displays each association rule as a tab separated row alongside itemset frequency, 
     lift, confidence and support values.
 
     Parameters:
     associationRules (list): A list of sorted association rules
     """
-    pd.set_option('display.max_rows', 1000)
-    pd.set_option('display.max_columns', 500)
-    pd.set_option('display.width', 150)
-
-    ruleList = []
+    print("Rule\tLength\tLift\tConf\tSup")
     for associationRule in associationRules:
-        rule = [str(associationRule), len(associationRule.itemset), round(associationRule.lift, 2), associationRule.confidence, associationRule.support]
-        ruleList.append(rule)
-    df = pd.DataFrame(ruleList, columns=["Rule", "Length", "Lift", "Conf", "Sup"])
-    print(df.to_string(index=False))
+        print("{}\t{}\t{}\t{}\t{}".format(associationRule, len(associationRule.itemset), round(associationRule.lift, 2), associationRule.confidence, associationRule.support))
 
 def main():
     startTime = time.time()
@@ -5,15 +5,18 @@ class AssociationRule():
     Parameters:
     body (set): The set of items in the body of the association rule
     head (set): The set of items in the head of the association rule
+    support (float): Support of the rule (optional)
+    confidence (float): Confidence of the rule (optional)
+    lift (float): Lift of the rule (optional)
 
     """
-    def __init__(self, body:set, head:set):
+    def __init__(self, body:set, head:set, support:float=None, confidence:float=None, lift:float=None):
         self.head = head
         self.body = body
         self.itemset = body.union(head)
-        self.confidence = None
-        self.support = None
-        self.lift = None
+        self.confidence = confidence
+        self.support = support
+        self.lift = lift
 
     def __str__(self) -> str:
         return "{} -> {}".format(self.body, self.head)
\ No newline at end of file
@@ -1,15 +1,12 @@
-import csv
-import itertools
 import time
-import pandas as pd
-from AssociationRule import AssociationRule
+from Apriori import Apriori, displayAssociationRules
 
-class ExtendedApriori():
+class ExtendedApriori(Apriori):
     """
     This object implements the Apriori unsupervised machine learning algorithm 
-    for frequent item set mining and association rule learning
+    for frequent item set mining and association rule learning, extended with a minimum relative support
     """
-    def __init__(self, minsup:float, minconf:float, minlift:float, minRelativeSup:float, path:str):
+    def __init__(self, minsup:float, minconf:float, minlift:float, minRelativeSup:float, path:str, verbose:bool=False, maxLength:int=None):
         """Initalise the Apiori class
 
         Parameters:
@@ -18,218 +15,85 @@ class ExtendedApriori():
         minlift (float): Minimum lift
         minRelativeSup (float): Minimum relative support
         path (str): Transaction CSV path - each line is transaction of items seperated by comma
-        items (set): The set of unique items found across all transactions - initalised by generateUniqueItemSet()
-        transactions (list): A list of sets for each transaction - where each is a set of items
+        verbose (bool): Print per-level progress while mining (default False)
+        maxLength (int): Longest itemset to mine - mining stops after this level (default None, no limit)
+        The remaining attributes are those of Apriori
 
         Returns:
         None:Returning value
         """
-        self.minsup = minsup
-        self.minconf = minconf
-        self.minlift = minlift
         self.minRelativeSup = minRelativeSup
-        self.path = path
-        self.transactions = []
-        self.items = []
-        self.importTransactions()
-        self.generateUniqueItemSet()
+        super().__init__(minsup, minconf, minlift, path, verbose, maxLength)
 
-    def run(self):
-        """
-        Runs the Apriori itemset frequency algorithm and returns a sorted list of association rules that pass the minsup, minconf and minlift rules
-        """
-        print("Running Apriori...")
-        print(" a. Finding association rules from {} transactions and {} unique items...".format(len(self.transactions), len(self.items)))
-        frequentSets = self.generateFrequentSets() # find all frequent itemsets of length 1 to k-1
-        print(" b. Generating association rules from frequent itemsets...")
-        associationRules = self.generateAssociationRules(frequentSets) # generate rules that pass the minsup, minlift and minsup thresholds
-        print(" c. Sorting association rules...")
-        associationRules = self.sortAssociationRules(associationRules) # sorts rules by length, lift, confidence and support
-        print("Complete.")
-        return frequentSets, associationRules
-
-    def generateAssociationRules(self, frequentSets:list)->list:
-        """
-        Generates a list of association rules that meet the confidence and lift thresholds
-
-        Parameters:
-        frequentSets (list): A list of frequent itemsets
-
-        Returns:
-        list: A list containing the association rules that pass the support, confidence and lift thresholds
-        """
-        associationRules = []
-        # partition the set  
-        for itemset in frequentSets:
-            for i in range(len(itemset)):
-                for c in [c for c in itertools.combinations(itemset, i+1)]:
-                    body = set(list(c))
-                    head = set([i for i in itemset if not i in c])
-                    if (len(head) > 0 and len(body) > 0):
-                        # from head/body partitions create association rules 
-                        associationRule = AssociationRule(body, head) # X -> Y
-                        associationRule.support = self.calculateSupport(associationRule.itemset)
-                        associationRule.confidence = self.calculateConfidence(associationRule.itemset, associationRule.body)
-                        associationRule.lift = self.calculateLift(associationRule.body, associationRule.head, associationRule.confidence)
-                        # test is rule passes minconf, minsup and minlift
-                        if (associationRule.confidence >= self.minconf) and (associationRule.support >= self.minsup) and (associationRule.lift >= self.minlift):
-                            associationRules.append(associationRule)
-        return associationRules
-
-    def generateFrequentSets(self)->list:
+    def generateFrequentSets(self)->dict:
         """
         Implements the Apriori frequent itemset generation algorithm.
-        Where itemsets is c_k and frequentSets = l_k 
+        Where itemsets is c_k and frequentSets = l_k. Itemsets are handled as bitmasks until they are returned
 
         Returns:
-        list: A list of frequent itemsets of size k-1
+        dict: The frequent itemsets of every size mapped to their support - each itemset appears once
         """
         allFrequentSets = []
 
         # Generate frequent itemsets of length k
-        frequentSets, infrequentSets = self.eliminateCandidates(self.items) # c_1
-        for fset in frequentSets:
-            allFrequentSets.append(fset)
+        frequentSets = self.eliminateCandidates([self.itemsetToMask(item) for item in self.items]) # c_1
+        allFrequentSets.extend(frequentSets)
         # Repeat until no new frequent itemsets are identified
         k = 1
         while True:  
             k += 1
-            print("     k = " + str(k) + "    " , end="\n")
+            if self.maxLength is not None and k > self.maxLength:
+                break
+            if self.verbose:
+                print("     k = " + str(k) + "    " , end="\n")
             # Generate length (k+1) candidate itemsets from length k frequent itemsets
             itemsets = self.generateItemSets(frequentSets, k)
 
             # Task 5 extention
             maxSubsetSup = self.calculateMaxSubsetSupport(frequentSets)
 
-            # Prune candidate itemsets containing subsets of length k that are infrequent
-            itemsets = self.prune(itemsets, infrequentSets)
+            # Prune candidate itemsets containing subsets of length k-1 that are not frequent
+            itemsets = self.prune(itemsets, frequentSets)
             # Count the support of each candidate by scanning the DB
             # Eliminate candidates that are infrequent, leaving only those that are frequent
-            prevFrequentSets = frequentSets.copy() # holds a copy of frequent sets for k-1
-            frequentSets, infrequentSets = self.eliminateCandidates(itemsets, maxSubsetSup)
-            # Runs until no frequent itemsets are identified
-            if len(frequentSets) == 0:
-                frequentSets = prevFrequentSets
+            nextFrequentSets = self.eliminateCandidates(itemsets, maxSubsetSup)
+            # Runs until no frequent itemsets are identified - frequentSets is left holding those of size k-1
+            if len(nextFrequentSets) == 0:
                 break
+            frequentSets = nextFrequentSets
             # stores all the frequent itemsets of size k
-            for fset in frequentSets:
-                allFrequentSets.append(fset)
-        return allFrequentSets
-
-    def sortAssociationRules(self, associationRules:list)->list: # TODO: sorted output list
-        """
-        Sorts the given list of association rules by four different attributes.
-        Including by itemset length (decreasing), minlift, minconf and minsup (decreasing)
-
-        Paramaters:
-        associationRules (list): A list of AssociationRule objects
-
-        Returns:
-        list: A sorted list of AssociationRule objects
-
-        """
-        associationRules = sorted(associationRules, key=lambda x: x.support, reverse=True) # support (decreasing)
-        associationRules = sorted(associationRules, key=lambda x: x.confidence, reverse=False) # confidence
-        associationRules = sorted(associationRules, key=lambda x: x.lift, reverse=False) # lift value
-        associationRules = sorted(associationRules, key=lambda x: len(x.itemset), reverse=True) # number of items (decreasing)
+            allFrequentSets.extend(frequentSets)
+        return {self.maskToItemset(fset): self.countCache[fset] * self.invNumTransactions for fset in allFrequentSets}
 
-        return associationRules
-    
-    def eliminateCandidates(self, itemsets:list, maxSubsetSup:float=None)->tuple:
+    def eliminateCandidates(self, itemsets:list, maxSubsetSup:float=None)->list:
         """
         Sorts candiadate itemsets by calculating the support value and comparing to the mininimum support value
 
         Parameters:
-        itemsets (list): A list of sets to sort
+        itemsets (list): A list of itemset masks to sort
 
         Returns:
-        tuple: Returns a tuple of two sets. Containing the eliminated rules and one containing rules that pass
+        list: The itemsets that pass
         """
         frequentSets = []
-        infrequentSets = []
+        supports = self.calculateSupportValues(itemsets) # count every candidate in one pass
         for i in range(len(itemsets)):
-            sup = self.calculateSupport(itemsets[i])
+            sup = supports[i]
             if sup >= self.minsup:
-                if maxSubsetSup != None and len(itemsets[i]) > 2:
+                if maxSubsetSup != None and itemsets[i].bit_count() > 2:
                     if maxSubsetSup >= self.minRelativeSup:
-                        print(len(itemsets))
                         frequentSets.append(itemsets[i])
-                    else:
-                        infrequentSets.append(itemsets[i])
                 else:
                     frequentSets.append(itemsets[i])
-            else:
-                infrequentSets.append(itemsets[i])
-        return frequentSets, infrequentSets
-
-    def generateItemSets(self, items:set, k:int)->list:
-        """
-        Generates combinations of itemsets and returns a list of sets
-
-        Parameters
-        items (set): The set of items to generate combinations from
-        k (int): The length of the generated sets
-
-        Returns:
-        list: List of the generated combinations of length k
-        """
-        pairs = list(itertools.combinations(items, 2))
-
-        itemsets = []
-        for pair in pairs:
-            set1 = pair[0]
-            set2 = pair[1]
-            set3 = set1.union(set2)
-            if set3 not in itemsets and len(set3) == k:
-                itemsets.append(set3)
-        return itemsets
-
-    def generateUniqueItemSet(self):
-        """
-        Generates a set of items that appear across all transactions. Updates the class attribute self.transactions
-        """
-        items = set()
-        for transaction in self.transactions:
-            for item in transaction:
-                if item not in self.items:
-                    items.add(item)
-        for item in items:
-            s = set()
-            s.add(item)
-            self.items.append(s)
-
-    def importTransactions(self):
-        """
-        Reads in the csv file of transactions. The file is assumed to have no header. Each row is a set of items contained within a transaction
-        """
-        with open(self.path, 'r', newline='') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                cleanedRow = []
-                for item in row:
-                    cleanedRow.append(item.strip().upper())
-                self.transactions.append(set(cleanedRow))
+        return frequentSets
 
-    def calculateSupport(self, itemset:set)->float:
-        """
-        Calculates the support value of a set by dividing the number of transactions a set occurs in with the total number of transactions
-
-        Parameters
-        itemset (set): A set of items
-
-        Returns:
-        float: The support value for that set (rule)
-
-        """
-        return self.count(itemset) / len(self.transactions)
-
-    def calculateRelativeSupport(self, itemset:set, maxSubsetSup:float)->float:
+    def calculateRelativeSupport(self, itemset, maxSubsetSup:float)->float:
         """
         Calculates the relative support of an itemset against the maximum sort from
         the itemsets of the previous iteration k - 1
 
         Parameters:
-        itemset (set): A set of items
+        itemset (set|int): A set of items, or its bitmask
         maxSubsetSup (float): The maximum support for k-1 frequent itemsets
 
         Returns:
@@ -243,7 +107,7 @@ class ExtendedApriori():
         Finds the maximum support value given a list of itemsets
 
         Paramaters:
-        itemsets (list): A list of itemsets
+        itemsets (list): A list of itemset masks
 
         Returns:
         float: The maximum support value
@@ -258,94 +122,6 @@ class ExtendedApriori():
                 maxSubsetSup = sup
         return maxSubsetSup
 
-    def calculateConfidence(self, itemset:set, body:set)->float:
-        """
-        Calculates how often items in Y appear in transactions containing X
-
-        Parameters:
-        set (set): A set of items
-
-        Returns:
-        float: The confidence value for that set (rule)
-
-        """
-        return self.calculateSupport(itemset) / self.calculateSupport(body)
-
-    def calculateLift(self, body:set, head:set, confidence:float)->float:
-        """
-        Calculates the importance of a rule
-
-        Parameters:
-        body (set): The set of items in the association rule body
-        head (set): The set of items in the head of the association rule
-
-        Returns:
-        float: The lift value of the association rule
-
-        """
-        bodySupport = self.calculateSupport(body)
-        headSupport = self.calculateSupport(head)
-        return confidence / ((bodySupport * headSupport) / bodySupport)
-
-    def count(self, s:set)->int:
-        """
-        Parameters
-        set (set): A set of items
-
-        Returns:
-        int: Frequency count for how many times s is a subset of a transaction t
-        """
-        count = 0
-        for transaction in self.transactions:
-            if set(s).issubset(transaction):
-                count += 1
-        return count
-
-    def prune(self, itemsets:list, infrequentSets:list)->list:
-        """
-        Prunes itemsets from the list of itemsets if any of the sets in infrequentSets are subsets of the itemset
-
-        Parameter
-        itemsets (list): A list of itemsets to prune
-        infrequentSets (list): A list of subsets to check
-
-        Returns
-        list: A pruned list of itemsets
-        """
-
-        if len(infrequentSets) == 0:
-            return itemsets
-        else:
-            for i in range(len(itemsets)):
-                #print("     " +str(round(i / len(itemsets) * 100, 2)) + "%", end="")
-                #print("\r", end="")
-                for j in range(len(infrequentSets)):
-                    if itemsets[i] == None: 
-                        break # set has been pruned so all other comparisons can be skipped
-                    elif (infrequentSets[j].issubset(itemsets[i])):
-                        itemsets[i] = None
-            prunedSets = [itemset for itemset in itemsets if itemset is not None] # filter all nonpruned itemsets
-            return prunedSets
-
-def displayAssociationRules(associationRules:list):
-    """
-    Displays each association rule in a df alongside itemset frequency, 
-    lift, confidence and support values.
-
-    Parameters:
-    associationRules (list): A list of sorted association rules
-    """
-    pd.set_option('display.max_rows', 1000)
-    pd.set_option('display.max_columns', 500)
-    pd.set_option('display.width', 150)
-
-    ruleList = []
-    for associationRule in associationRules:
-        rule = [str(associationRule), len(associationRule.itemset), round(associationRule.lift, 2), associationRule.confidence, associationRule.support]
-        ruleList.append(rule)
-    df = pd.DataFrame(ruleList, columns=["Rule", "Length", "Lift", "Conf", "Sup"])
-    print(df.to_string(index=False))
-
 def main():
     startTime = time.time()
 
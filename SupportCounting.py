@@ -0,0 +1,98 @@
+import numpy as np
+
+PARALLEL_MIN_CANDIDATES = 16384 # below this a level is counted faster on one thread
+BLOCK_BYTES = 1 << 26 # candidate bitmaps ANDed at once are capped at 64 MiB
+LEVEL_ROWS_BYTES = 1 << 29 # bitmaps kept for the next level are capped at 512 MiB - past it counting falls back to the item bitmap
+
+def popcount64(a:np.ndarray)->np.ndarray:
+    """
+    Counts the number of set bits in each element of a uint64 array.
+    Uses np.bitwise_count where available (NumPy 2.0+), otherwise the SWAR bit counting trick
+
+    Parameters:
+    a (np.ndarray): A uint64 array
+
+    Returns:
+    np.ndarray: The number of set bits in each element
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(a)
+    a = a - ((a >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    a = (a & np.uint64(0x3333333333333333)) + ((a >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    a = (a + (a >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (a * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+def compactBits(rows:np.ndarray, keep:np.ndarray)->np.ndarray:
+    """
+    Drops bit columns from rows of a uint64 bitmap, packing the kept bits of each row together in their original order
+
+    Parameters:
+    rows (np.ndarray): (rows, words) uint64 bitmap
+    keep (np.ndarray): bool mask of the bit columns to keep - its length is the number of used bit columns
+
+    Returns:
+    np.ndarray: (rows, ceil(kept/64)) uint64 bitmap
+    """
+    out = np.zeros((len(rows), (np.count_nonzero(keep) + 63) // 64), dtype=np.uint64)
+    outBytes = out.view(np.uint8)
+    blockSize = max(BLOCK_BYTES // max(len(keep), 1), 1) # a block of rows at a time bounds the unpacked size
+    for start in range(0, len(rows), blockSize):
+        bits = np.unpackbits(rows[start:start+blockSize].view(np.uint8), axis=1, count=len(keep), bitorder='little')[:, keep]
+        packed = np.packbits(bits, axis=1, bitorder='little')
+        outBytes[start:start+blockSize, :packed.shape[1]] = packed
+    return out
+
+def columnCounts(rows:np.ndarray, numColumns:int)->np.ndarray:
+    """
+    Counts the set bits in each bit column of a uint64 bitmap, unpacking a block of rows at a time to bound the unpacked size
+
+    Parameters:
+    rows (np.ndarray): (rows, words) uint64 bitmap
+    numColumns (int): The number of used bit columns
+
+    Returns:
+    np.ndarray: int32 count of each bit column
+    """
+    counts = np.zeros(numColumns, dtype=np.int32)
+    blockSize = max(BLOCK_BYTES // max(numColumns, 1), 1)
+    for start in range(0, len(rows), blockSize):
+        counts += np.unpackbits(rows[start:start+blockSize].view(np.uint8), axis=1, count=numColumns, bitorder='little').sum(axis=0, dtype=np.int32)
+    return counts
+
+def trieSupportCounts(bitmap:np.ndarray, ids:np.ndarray)->np.ndarray:
+    """
+    Counts the transactions containing each itemset of a level.
+    The itemsets are arranged into a prefix trie of sorted item ids which is walked one depth at a time,
+    so the bitmap of a shared prefix is ANDed once and reused by every itemset below it
+
+    Parameters:
+    bitmap (np.ndarray): Vertical uint64 item bitmap
+    ids (np.ndarray): (itemsets, k) array of item ids, sorted along each row
+
+    Returns:
+    np.ndarray: The frequency count of each itemset
+    """
+    # depth 1 of the trie - one node per distinct first item
+    nodes, parents = np.unique(ids[:, :1], axis=0, return_inverse=True)
+    rows = bitmap[nodes[:, 0]]
+    for d in range(1, ids.shape[1]):
+        nodes, inverse = np.unique(ids[:, :d+1], axis=0, return_inverse=True)
+        # find the parent node of each new node through any itemset that passes through it
+        first = np.empty(len(nodes), dtype=np.intp)
+        first[inverse] = np.arange(len(ids))
+        rows = rows[parents[first]] & bitmap[nodes[:, d]]
+        parents = inverse
+    return popcount64(rows).sum(axis=1)[parents]
+
+def loadBatchSupport():
+    """
+    Imports the Numba batchSupport kernel on first use, so loading this module does not pay for importing Numba
+
+    Returns:
+    function: batchSupport, or None when Numba is not installed
+    """
+    try:
+        from SupportCountingNumba import batchSupport
+    except ImportError: # optional - batched support counting falls back to NumPy
+        return None
+    return batchSupport
@@ -0,0 +1,31 @@
+import numba
+
+@numba.njit(inline='always')
+def popcount64Scalar(x):
+    """
+    SWAR bit count of a single uint64 - LLVM lowers this to popcnt where the CPU supports it
+    """
+    x = x - ((x >> numba.uint64(1)) & numba.uint64(0x5555555555555555))
+    x = (x & numba.uint64(0x3333333333333333)) + ((x >> numba.uint64(2)) & numba.uint64(0x3333333333333333))
+    x = (x + (x >> numba.uint64(4))) & numba.uint64(0x0F0F0F0F0F0F0F0F)
+    return (x * numba.uint64(0x0101010101010101)) >> numba.uint64(56)
+
+@numba.njit(parallel=True, cache=True)
+def batchSupport(bitmap, candItems, out):
+    """
+    Counts the transactions containing each candidate, one candidate per thread.
+    Each bitmap word of a candidate is ANDed across its items then popcounted
+
+    Parameters:
+    bitmap (np.ndarray): Vertical uint64 item bitmap
+    candItems (np.ndarray): (candidates, k) int32 array of item ids
+    out (np.ndarray): int64 array the counts are written to
+    """
+    for c in numba.prange(candItems.shape[0]):
+        s = 0
+        for w in range(bitmap.shape[1]):
+            word = bitmap[candItems[c, 0], w]
+            for j in range(1, candItems.shape[1]):
+                word &= bitmap[candItems[c, j], w]
+            s += popcount64Scalar(word)
+        out[c] = s
@@ -0,0 +1,133 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+import Apriori as AprioriModule
+import SupportCounting
+from Apriori import Apriori
+from ExtendedApriori import ExtendedApriori
+
+class ImportTransactionsTest(unittest.TestCase):
+    """
+    Regression checks for importTransactions()
+    """
+    def writeCsv(self, text:str)->str:
+        """
+        Writes text to a temporary CSV file, removed when the test finishes
+
+        Parameters:
+        text (str): The file contents
+
+        Returns:
+        str: Path of the file
+        """
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w', newline='') as f:
+            f.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def testQuotedNewline(self):
+        # a quoted field holding a newline spans two physical lines but is one record - no field may be lost
+        path = self.writeCsv('a,"x\ny",b,c\na,b')
+        for apriori in (Apriori(0.5, 0.5, 0, path), ExtendedApriori(0.5, 0.5, 0, 0, path)):
+            self.assertEqual(apriori.transactions, [frozenset({'A', 'X\nY', 'B', 'C'}), frozenset({'A', 'B'})])
+            self.assertEqual(apriori.calculateSupport({'A'}), 1.0)
+            self.assertEqual(apriori.calculateSupport({'X\nY', 'C'}), 0.5)
+
+    def testNonAsciiUpper(self):
+        # 'ß' upper-cases to 'SS', so the item is longer than the token it came from
+        path = self.writeCsv('bier,weißbier\nbier')
+        for apriori in (Apriori(0.5, 0.5, 0, path), ExtendedApriori(0.5, 0.5, 0, 0, path)):
+            self.assertEqual(apriori.transactions, [frozenset({'BIER', 'WEISSBIER'}), frozenset({'BIER'})])
+            self.assertEqual(apriori.calculateSupport({'WEISSBIER'}), 0.5)
+
+    def testLineEndings(self):
+        # CR-only and CRLF line endings separate transactions just as LF does
+        for text in ('a,b\rc\r', 'a,b\r\nc\r\n'):
+            apriori = Apriori(0.5, 0.5, 0, self.writeCsv(text))
+            self.assertEqual(apriori.transactions, [frozenset({'A', 'B'}), frozenset({'C'})])
+
+    def testBlankLines(self):
+        # every blank line is an empty transaction, whether or not the file has any items
+        self.assertEqual(Apriori(0.5, 0.5, 0, self.writeCsv('\n\n\n')).transactions, [frozenset()] * 3)
+        self.assertEqual(Apriori(0.5, 0.5, 0, self.writeCsv('a\n\nb\n')).transactions, [frozenset({'A'}), frozenset(), frozenset({'B'})])
+
+def mine(apriori:Apriori)->tuple:
+    """
+    Runs apriori with its progress output silenced
+
+    Parameters:
+    apriori (Apriori): The miner to run
+
+    Returns:
+    tuple: The frequent itemsets mapped to their rounded support, and the set of rules as (body, head, support, confidence, lift) tuples
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        frequentSets, associationRules = apriori.run()
+    frequentSets = {itemset: round(support, 9) for itemset, support in frequentSets.items()}
+    rules = {(frozenset(rule.body), frozenset(rule.head), round(rule.support, 9), round(rule.confidence, 9), round(rule.lift, 9)) for rule in associationRules}
+    return frequentSets, rules
+
+class SupportCountingTest(unittest.TestCase):
+    """
+    Checks that every support counting path mines the same itemsets and rules
+    """
+    def setUp(self):
+        self.expected = mine(Apriori(0.2, 0.5, 0, 'task1.csv'))
+
+    def testFallbackCounting(self):
+        # no level bitmaps can be kept and Numba is unavailable, so levels past the first are counted by trieSupportCounts -
+        # the tiny blocks AND, unpack and pack a single row at a time
+        with mock.patch.object(AprioriModule, 'LEVEL_ROWS_BYTES', 0), mock.patch.object(AprioriModule, 'BLOCK_BYTES', 8), \
+                mock.patch.object(SupportCounting, 'BLOCK_BYTES', 8), mock.patch.object(AprioriModule, 'loadBatchSupport', return_value=None):
+            self.assertEqual(mine(Apriori(0.2, 0.5, 0, 'task1.csv')), self.expected)
+            # the same again split across worker threads
+            with mock.patch.object(AprioriModule, 'PARALLEL_MIN_CANDIDATES', 1), mock.patch('os.cpu_count', return_value=2):
+                self.assertEqual(mine(Apriori(0.2, 0.5, 0, 'task1.csv')), self.expected)
+
+    def testBatchSupport(self):
+        if SupportCounting.loadBatchSupport() is None:
+            self.skipTest('Numba is not installed')
+        with mock.patch.object(AprioriModule, 'LEVEL_ROWS_BYTES', 0):
+            self.assertEqual(mine(Apriori(0.2, 0.5, 0, 'task1.csv')), self.expected)
+
+    def testReduceTransactions(self):
+        # only the transaction A, B, C, D, F holds more than four of the items of the frequent 4-itemsets,
+        # so at k = 4 the level bitmaps are compacted from five transactions down to one
+        apriori = Apriori(0.2, 0.5, 0, 'task1.csv')
+        sizes = []
+        reduceTransactions = apriori.reduceTransactions
+        def recordSizes(frequentSets, k):
+            before = len(apriori.levelTids)
+            reduceTransactions(frequentSets, k)
+            sizes.append((k, before, len(apriori.levelTids)))
+        with mock.patch.object(apriori, 'reduceTransactions', side_effect=recordSizes):
+            self.assertEqual(mine(apriori), self.expected)
+        self.assertIn((4, 5, 1), sizes)
+        # mining on without ever compacting gives the same result
+        with mock.patch.object(Apriori, 'reduceTransactions'):
+            self.assertEqual(mine(Apriori(0.2, 0.5, 0, 'task1.csv')), self.expected)
+
+class MaxLengthTest(unittest.TestCase):
+    """
+    Checks that maxLength bounds the mined itemsets
+    """
+    def testInvalid(self):
+        for maxLength in (0, -1):
+            with self.assertRaises(ValueError):
+                Apriori(0.2, 0.5, 0, 'task1.csv', maxLength=maxLength)
+            with self.assertRaises(ValueError):
+                ExtendedApriori(0.2, 0.5, 0, 0, 'task1.csv', maxLength=maxLength)
+
+    def testMaxLength(self):
+        frequentSets, rules = mine(Apriori(0.2, 0.5, 0, 'task1.csv'))
+        boundedSets, boundedRules = mine(Apriori(0.2, 0.5, 0, 'task1.csv', maxLength=2))
+        self.assertTrue(all(len(itemset) <= 2 for itemset in boundedSets))
+        self.assertEqual(boundedSets, {itemset: support for itemset, support in frequentSets.items() if len(itemset) <= 2})
+        self.assertEqual(boundedRules, {rule for rule in rules if len(rule[0] | rule[1]) <= 2})
+
+if __name__ == "__main__":
+    unittest.main()